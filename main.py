@@ -3,14 +3,24 @@ Simple FastAPI Application for Forex Trading Analysis Platform
 Root-level simple server for easy deployment
 """
 
-from fastapi import FastAPI, File, UploadFile, Form
+from fastapi import FastAPI, File, UploadFile, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+import gzip
+import hashlib
+import importlib.util
 import os
-import pandas as pd
-import numpy as np
-import io
-import json
+import shutil
+import tempfile
+import orjson
+
+# pandas/numpy (and pyarrow) are imported lazily in the upload handler so that
+# worker cold-start, "/" and "/health" do not pay for their import chain
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# CSV uploads larger than this (in bytes) are read with the multi-threaded pyarrow engine
+PYARROW_CSV_THRESHOLD = 1_000_000
 
 # Create FastAPI application
 app = FastAPI(
@@ -28,10 +38,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.get("/")
-async def root():
-    """Root endpoint returning a basic HTML interface"""
-    return HTMLResponse("""
+# Substring rules for spotting MT5/MT4 columns; each key takes the first column matching any needle
+COLUMN_DETECTION_RULES = (
+    ('ticket', ('ticket',)),
+    ('time', ('time', 'date')),
+    ('symbol', ('symbol',)),
+    ('type', ('type',)),
+    ('size', ('size', 'volume')),
+    ('price', ('price',)),
+    ('profit', ('profit',)),
+    ('balance', ('balance',)),
+)
+
+# Header keywords whose presence marks a CSV header row as MT5/MT4 trade data
+MT5_INDICATORS = ('ticket', 'time', 'type', 'size', 'symbol', 'price', 'profit')
+
+# Ordered rules mapping MT5 "Positions" headers to standard names; the first match wins
+MT5_COLUMN_RULES = (
+    ('time', lambda c: 'time' in c),
+    ('position', lambda c: 'position' in c or 'ticket' in c),
+    ('symbol', lambda c: 'symbol' in c),
+    ('type', lambda c: 'type' in c),
+    ('volume', lambda c: 'volume' in c or 'size' in c),
+    ('open_price', lambda c: 'price' in c and 'close' not in c),
+    ('sl', lambda c: 's/l' in c or 'sl' in c),
+    ('tp', lambda c: 't/p' in c or 'tp' in c),
+    ('close_time', lambda c: 'close' in c and 'time' in c),
+    ('close_price', lambda c: 'close' in c and 'price' in c),
+    ('commission', lambda c: 'commission' in c),
+    ('swap', lambda c: 'swap' in c),
+    ('profit', lambda c: 'profit' in c),
+)
+
+# Landing page served by the root endpoint; built and gzip-compressed once at import
+ROOT_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -209,23 +249,78 @@ async def root():
         </div>
     </body>
     </html>
-    """)
+    """
+ROOT_HTML_BYTES = ROOT_HTML.encode('utf-8')
+ROOT_HTML_GZ = gzip.compress(ROOT_HTML_BYTES, compresslevel=9)
+# Weak validator: the same page is served both gzip-encoded and plain
+ROOT_ETAG = f'W/"{hashlib.md5(ROOT_HTML_BYTES).hexdigest()}"'
+ROOT_HEADERS = {"ETag": ROOT_ETAG, "Cache-Control": "public, max-age=60", "Vary": "Accept-Encoding"}
+
+# Health payload never changes within a process, so it is serialized once
+HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "service": "forex-analyzer",
+    "version": "1.0.0",
+    "environment": os.getenv("RENDER_SERVICE_NAME", "production"),
+    "features": [
+        "data_processing",
+        "ml_analysis", 
+        "plugin_system",
+        "mobile_optimized"
+    ]
+})
+HEALTH_ETAG = f'W/"{hashlib.md5(HEALTH_BYTES).hexdigest()}"'
+# no-cache keeps probes reaching the server while still allowing 304 revalidation
+HEALTH_HEADERS = {"ETag": HEALTH_ETAG, "Cache-Control": "no-cache"}
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag (weak comparison)"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+# String cell values the upload response reports as "N/A", as it does NaN and infinities
+NA_STRINGS = frozenset({'nan', 'inf', '-inf', 'none', 'null'})
+
+def normalize_na_string(value):
+    """Return "N/A" for a string spelling of a missing or infinite value, otherwise the value unchanged"""
+    if isinstance(value, str) and value.lower() in NA_STRINGS:
+        return "N/A"
+    return value
+
+def header_line_index(path: str, header_row: int):
+    """Physical line number of a CSV header given pandas' header=N, which skips blank lines; None if absent"""
+    with open(path, 'rb') as f:
+        non_blank = 0
+        for line_number, line in enumerate(f):
+            if not line.strip():
+                continue
+            if non_blank == header_row:
+                return line_number
+            non_blank += 1
+    return None
+
+@app.get("/")
+async def root(request: Request):
+    """Root endpoint returning a basic HTML interface"""
+    if etag_matches(request, ROOT_ETAG):
+        return Response(status_code=304, headers=ROOT_HEADERS)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            content=ROOT_HTML_GZ,
+            media_type="text/html",
+            headers={**ROOT_HEADERS, "Content-Encoding": "gzip"}
+        )
+    return HTMLResponse(ROOT_HTML_BYTES, headers=ROOT_HEADERS)
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint for monitoring"""
-    return {
-        "status": "healthy",
-        "service": "forex-analyzer",
-        "version": "1.0.0",
-        "environment": os.getenv("RENDER_SERVICE_NAME", "production"),
-        "features": [
-            "data_processing",
-            "ml_analysis", 
-            "plugin_system",
-            "mobile_optimized"
-        ]
-    }
+    if etag_matches(request, HEALTH_ETAG):
+        return Response(status_code=304, headers=HEALTH_HEADERS)
+    return Response(content=HEALTH_BYTES, media_type="application/json", headers=HEALTH_HEADERS)
 
 @app.get("/api/v1/test")
 async def test_endpoint():
@@ -246,6 +341,10 @@ async def test_endpoint():
 @app.post("/api/v1/upload")
 async def upload_file(file: UploadFile = File(...)):
     """Handle file upload and basic analysis"""
+    import numpy as np
+    import pandas as pd
+    
+    tmp_path = None
     try:
         # Validate file type
         if not file.filename.lower().endswith(('.csv', '.xlsx', '.xls')):
@@ -254,35 +353,40 @@ async def upload_file(file: UploadFile = File(...)):
                 content={"error": "Invalid file type. Please upload CSV, XLSX, or XLS files."}
             )
         
-        # Read file content
-        content = await file.read()
+        # Stream the upload to disk so pandas reads from a file rather than an in-memory copy
+        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp:
+            tmp_path = tmp.name
+            await run_in_threadpool(shutil.copyfileobj, file.file, tmp)
         
         # Advanced MT5/MT4 file parsing based on proven working code
-        def parse_mt5_excel(content):
+        def rows_containing(block, pattern):
+            """Boolean mask of rows in a 2-D object array with any cell matching pattern"""
+            if block.size == 0:
+                return np.zeros(len(block), dtype=bool)
+            cells = pd.Series(block.reshape(-1)).astype(str)
+            return cells.str.contains(pattern, regex=True).to_numpy().reshape(block.shape).any(axis=1)
+
+        def parse_mt5_excel(path):
             """Parse MT5 Excel export using the proven method from working code"""
+            # Read Excel file once; the raw frame doubles as the standard-parsing fallback
+            df_raw = pd.read_excel(path)
             try:
-                # Read Excel file
-                df_raw = pd.read_excel(io.BytesIO(content))
-                
+                raw_values = df_raw.to_numpy(dtype=object)
+
                 # Find "Positions" section (key indicator of MT5 format)
-                positions_idx = None
-                for idx, row in df_raw.iterrows():
-                    if 'Positions' in str(row.values) or 'Position' in str(row.values):
-                        positions_idx = idx
-                        break
-                
-                if positions_idx is None:
-                    # If no "Positions" found, try standard parsing
-                    return pd.read_excel(io.BytesIO(content), header=0), 0
-                
+                positions_mask = rows_containing(raw_values, 'Position')
+                if not positions_mask.any():
+                    # If no "Positions" found, use standard parsing
+                    return df_raw, 0
+                positions_idx = int(np.argmax(positions_mask))
+
                 # Extract positions data
                 header_idx = positions_idx + 1
                 orders_idx = None
-                for idx in range(header_idx + 1, len(df_raw)):
-                    if 'Orders' in str(df_raw.iloc[idx].values) or 'Deals' in str(df_raw.iloc[idx].values):
-                        orders_idx = idx
-                        break
-                
+                orders_mask = rows_containing(raw_values[header_idx + 1:], 'Orders|Deals')
+                if orders_mask.any():
+                    orders_idx = header_idx + 1 + int(np.argmax(orders_mask))
+
                 if orders_idx:
                     positions_data = df_raw.iloc[header_idx+1:orders_idx]
                 else:
@@ -299,148 +403,156 @@ async def upload_file(file: UploadFile = File(...)):
                 standard_columns = []
                 for col in df_clean.columns:
                     col_str = str(col).lower()
-                    if 'time' in col_str:
-                        standard_columns.append('time')
-                    elif 'position' in col_str or 'ticket' in col_str:
-                        standard_columns.append('position')
-                    elif 'symbol' in col_str:
-                        standard_columns.append('symbol')
-                    elif 'type' in col_str:
-                        standard_columns.append('type')
-                    elif 'volume' in col_str or 'size' in col_str:
-                        standard_columns.append('volume')
-                    elif 'price' in col_str and 'close' not in col_str:
-                        standard_columns.append('open_price')
-                    elif 's/l' in col_str or 'sl' in col_str:
-                        standard_columns.append('sl')
-                    elif 't/p' in col_str or 'tp' in col_str:
-                        standard_columns.append('tp')
-                    elif 'close' in col_str and 'time' in col_str:
-                        standard_columns.append('close_time')
-                    elif 'close' in col_str and 'price' in col_str:
-                        standard_columns.append('close_price')
-                    elif 'commission' in col_str:
-                        standard_columns.append('commission')
-                    elif 'swap' in col_str:
-                        standard_columns.append('swap')
-                    elif 'profit' in col_str:
-                        standard_columns.append('profit')
-                    else:
-                        standard_columns.append(col)
+                    standard_columns.append(next((target for target, matches in MT5_COLUMN_RULES if matches(col_str)), col))
                 
                 df_clean.columns = standard_columns
                 return df_clean, header_idx
                 
             except Exception as e:
                 # Fallback to simple parsing
-                return pd.read_excel(io.BytesIO(content), header=0), 0
+                return df_raw, 0
         
-        def parse_csv_file(content):
+        def read_csv(path, header_row):
+            """Read a CSV, using the pyarrow engine for large files when it is installed"""
+            if PYARROW_AVAILABLE and os.path.getsize(path) > PYARROW_CSV_THRESHOLD:
+                try:
+                    # pyarrow does not de-duplicate headers, so take the names pandas would assign
+                    names = pd.read_csv(path, header=header_row, nrows=0, encoding='utf-8').columns.tolist()
+                    # pyarrow's skiprows counts raw lines, blank ones included, unlike header=N
+                    header_line = header_line_index(path, header_row)
+                    if header_line is not None:
+                        return pd.read_csv(path, engine='pyarrow', header=None, names=names,
+                                           skiprows=header_line + 1, encoding='utf-8')
+                except Exception:
+                    pass  # Fall back to the C engine for dialects pyarrow rejects
+            return pd.read_csv(path, header=header_row, encoding='utf-8')
+        
+        def parse_csv_file(path):
             """Parse CSV with header detection"""
             for header_row in range(0, 5):
                 try:
-                    test_df = pd.read_csv(io.StringIO(content.decode('utf-8')), header=header_row)
-                    # Check for MT5 indicators
-                    columns_lower = [str(col).lower() for col in test_df.columns]
-                    mt5_indicators = ['ticket', 'time', 'type', 'size', 'symbol', 'price', 'profit']
-                    indicator_count = sum(1 for indicator in mt5_indicators 
-                                        if any(indicator in col for col in columns_lower))
+                    test_df = read_csv(path, header_row)
+                    # Check for MT5 indicators: one substring search each over the newline-joined headers
+                    header_text = "\n".join(str(col).lower() for col in test_df.columns)
+                    indicator_count = sum(1 for indicator in MT5_INDICATORS if indicator in header_text)
                     if indicator_count >= 3:
                         return test_df, header_row
                 except:
                     continue
-            return pd.read_csv(io.StringIO(content.decode('utf-8')), header=0), 0
+            return read_csv(path, 0), 0
         
         # Process based on file type
         if file.filename.lower().endswith('.csv'):
-            df, header_used = parse_csv_file(content)
+            df, header_used = await run_in_threadpool(parse_csv_file, tmp_path)
         else:
-            df, header_used = parse_mt5_excel(content)
-        
-        # Clean data for JSON serialization - handle all NaN/inf values
-        df_clean = df.replace([np.inf, -np.inf], "N/A").fillna("N/A")  # Replace NaN and infinity with "N/A"
+            df, header_used = await run_in_threadpool(parse_mt5_excel, tmp_path)
         
         # Enhanced analysis with MT5/MT4 specific insights
-        columns_lower = [str(col).lower() for col in df.columns]
+        # Stringify column labels once and reuse them for detection and the response
+        column_names = [str(col) for col in df.columns]
+        columns_lower = [col.lower() for col in column_names]
         
-        # Detect specific MT5/MT4 columns
-        detected_columns = {
-            'ticket': next((col for col in df.columns if 'ticket' in str(col).lower()), None),
-            'time': next((col for col in df.columns if 'time' in str(col).lower() or 'date' in str(col).lower()), None),
-            'symbol': next((col for col in df.columns if 'symbol' in str(col).lower()), None),
-            'type': next((col for col in df.columns if 'type' in str(col).lower()), None),
-            'size': next((col for col in df.columns if 'size' in str(col).lower() or 'volume' in str(col).lower()), None),
-            'price': next((col for col in df.columns if 'price' in str(col).lower()), None),
-            'profit': next((col for col in df.columns if 'profit' in str(col).lower()), None),
-            'balance': next((col for col in df.columns if 'balance' in str(col).lower()), None)
-        }
+        # Detect specific MT5/MT4 columns in a single pass over the headers
+        detected_columns = {key: None for key, _ in COLUMN_DETECTION_RULES}
+        for col, col_lower in zip(df.columns, columns_lower):
+            for key, needles in COLUMN_DETECTION_RULES:
+                if detected_columns[key] is None and any(needle in col_lower for needle in needles):
+                    detected_columns[key] = col
         
         # Calculate comprehensive trading statistics like the working MT5 analyzer
-        trading_stats = {}
-        if detected_columns['profit'] and detected_columns['profit'] in df.columns:
-            profit_col = detected_columns['profit']
-            profit_data = pd.to_numeric(df[profit_col], errors='coerce').dropna()
+        def calculate_trading_stats(df, detected_columns):
+            """Compute P&L, win-rate and drawdown statistics from the profit column"""
+            trading_stats = {}
+            if detected_columns['profit'] and detected_columns['profit'] in df.columns:
+                profit_col = detected_columns['profit']
+                # Work on a bare float64 array: no index alignment or Series wrapping per reduction
+                profit_values = pd.to_numeric(df[profit_col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+                valid_positions = np.flatnonzero(~np.isnan(profit_values))
+                profit_data = profit_values[valid_positions]
             
-            if len(profit_data) > 0:
-                # Basic statistics
-                winning_trades = len(profit_data[profit_data > 0])
-                losing_trades = len(profit_data[profit_data < 0])
-                total_profit = profit_data.sum()
+                if len(profit_data) > 0:
+                    # Basic statistics
+                    wins = profit_data[profit_data > 0]
+                    losses = profit_data[profit_data < 0]
+                    winning_trades = len(wins)
+                    losing_trades = len(losses)
+                    total_profit = profit_data.sum()
                 
-                # Advanced metrics
-                avg_win = profit_data[profit_data > 0].mean() if winning_trades > 0 else 0
-                avg_loss = abs(profit_data[profit_data < 0].mean()) if losing_trades > 0 else 0
+                    # Advanced metrics
+                    avg_win = wins.mean() if winning_trades > 0 else 0
+                    avg_loss = abs(losses.mean()) if losing_trades > 0 else 0
                 
-                # Profit factor calculation
-                total_wins = profit_data[profit_data > 0].sum()
-                total_losses = abs(profit_data[profit_data < 0].sum())
-                profit_factor = total_wins / total_losses if total_losses > 0 else total_wins
+                    # Profit factor calculation
+                    total_wins = wins.sum()
+                    total_losses = abs(losses.sum())
+                    profit_factor = total_wins / total_losses if total_losses > 0 else total_wins
                 
-                # Risk metrics
-                if 'commission' in df.columns:
-                    commission_data = pd.to_numeric(df['commission'], errors='coerce').fillna(0)
-                    net_profit = total_profit + commission_data.sum()
-                else:
-                    net_profit = total_profit
+                    # Risk metrics
+                    if 'commission' in df.columns:
+                        # nansum treats unparseable commissions as zero without a fillna copy
+                        commission_data = pd.to_numeric(df['commission'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+                        net_profit = total_profit + np.nansum(commission_data)
+                    else:
+                        net_profit = total_profit
+                
+                    # Calculate max drawdown from cumulative profit
+                    cumulative_profit = np.cumsum(profit_data)
+                    running_max = np.maximum.accumulate(cumulative_profit)
+                    # An infinite profit makes inf - inf = NaN; skip those like pandas' min did
+                    with np.errstate(invalid='ignore'):
+                        drawdown = cumulative_profit - running_max
+                    max_drawdown = abs(np.fmin.reduce(drawdown)) if len(drawdown) > 0 else 0
                 
-                # Calculate max drawdown from cumulative profit
-                cumulative_profit = profit_data.cumsum()
-                running_max = cumulative_profit.cummax()
-                drawdown = cumulative_profit - running_max
-                max_drawdown = abs(drawdown.min()) if len(drawdown) > 0 else 0
+                    # Resolve best/worst trade symbols positionally, independent of the frame's index
+                    best_idx = valid_positions[profit_data.argmax()]
+                    worst_idx = valid_positions[profit_data.argmin()]
+                    symbol_col = detected_columns['symbol']
+                    if symbol_col and symbol_col in df.columns:
+                        symbol_values = df[symbol_col].to_numpy()
+                        best_symbol = normalize_na_string(str(symbol_values[best_idx]))
+                        worst_symbol = normalize_na_string(str(symbol_values[worst_idx]))
+                    else:
+                        best_symbol = worst_symbol = 'N/A'
                 
-                trading_stats = {
-                    'total_profit': round(total_profit, 2),
-                    'net_profit': round(net_profit, 2),
-                    'winning_trades': winning_trades,
-                    'losing_trades': losing_trades,
-                    'total_trades': len(profit_data),
-                    'win_rate': round((winning_trades / len(profit_data)) * 100, 1) if len(profit_data) > 0 else 0,
-                    'avg_profit': round(profit_data.mean(), 2),
-                    'avg_win': round(avg_win, 2),
-                    'avg_loss': round(avg_loss, 2),
-                    'profit_factor': round(profit_factor, 2),
-                    'max_profit': round(profit_data.max(), 2),
-                    'max_loss': round(profit_data.min(), 2),
-                    'max_drawdown': round(max_drawdown, 2),
-                    'best_trade': {
-                        'profit': round(profit_data.max(), 2),
-                        'symbol': str(df.loc[profit_data.idxmax(), detected_columns['symbol']]) if detected_columns['symbol'] and detected_columns['symbol'] in df.columns else 'N/A'
-                    },
-                    'worst_trade': {
-                        'profit': round(profit_data.min(), 2),
-                        'symbol': str(df.loc[profit_data.idxmin(), detected_columns['symbol']]) if detected_columns['symbol'] and detected_columns['symbol'] in df.columns else 'N/A'
+                    trading_stats = {
+                        'total_profit': round(total_profit, 2),
+                        'net_profit': round(net_profit, 2),
+                        'winning_trades': winning_trades,
+                        'losing_trades': losing_trades,
+                        'total_trades': len(profit_data),
+                        'win_rate': round((winning_trades / len(profit_data)) * 100, 1) if len(profit_data) > 0 else 0,
+                        'avg_profit': round(profit_data.mean(), 2),
+                        'avg_win': round(avg_win, 2),
+                        'avg_loss': round(avg_loss, 2),
+                        'profit_factor': round(profit_factor, 2),
+                        'max_profit': round(profit_data.max(), 2),
+                        'max_loss': round(profit_data.min(), 2),
+                        'max_drawdown': round(max_drawdown, 2),
+                        'best_trade': {
+                            'profit': round(profit_data.max(), 2),
+                            'symbol': best_symbol
+                        },
+                        'worst_trade': {
+                            'profit': round(profit_data.min(), 2),
+                            'symbol': worst_symbol
+                        }
                     }
-                }
+            return trading_stats
+
+        trading_stats = await run_in_threadpool(calculate_trading_stats, df, detected_columns)
+        
+        # Slice before cleaning so only the preview rows have NaN/inf and their string spellings replaced with "N/A"
+        preview_records = df.head(3).replace([np.inf, -np.inf], "N/A").fillna("N/A").to_dict('records')
+        data_preview = [{key: normalize_na_string(value) for key, value in row.items()} for row in preview_records]
         
         analysis = {
             "filename": file.filename,
             "rows": len(df),
             "columns": len(df.columns),
             "header_row_used": header_used,
-            "column_names": df.columns.tolist(),
+            "column_names": column_names,
             "detected_columns": {k: v for k, v in detected_columns.items() if v is not None},
-            "data_preview": df_clean.head(3).to_dict('records') if len(df) > 0 else [],
+            "data_preview": data_preview,
             "summary": {
                 "total_records": len(df),
                 "file_type": "MT5/MT4 Trading Report" if len(detected_columns) >= 3 else "Trading Data",
@@ -451,67 +563,35 @@ async def upload_file(file: UploadFile = File(...)):
                     "has_symbol_column": detected_columns['symbol'] is not None,
                     "has_time_column": detected_columns['time'] is not None,
                     "has_ticket_column": detected_columns['ticket'] is not None,
-                    "columns_detected": len([col for col in df.columns if not str(col).startswith('Unnamed')])
+                    "columns_detected": sum(1 for col in column_names if not col.startswith('Unnamed'))
                 }
             }
         }
         
-        # Ultra-robust JSON serializer to handle ALL NaN cases
-        def clean_for_json(obj):
-            if isinstance(obj, dict):
-                return {k: clean_for_json(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [clean_for_json(v) for v in obj]
-            elif isinstance(obj, (np.integer, np.floating, np.number)):
-                try:
-                    if np.isnan(obj) or np.isinf(obj):
-                        return "N/A"
-                    return float(obj) if isinstance(obj, np.floating) else int(obj)
-                except:
-                    return "N/A"
-            elif isinstance(obj, (int, float)):
-                try:
-                    if np.isnan(obj) or np.isinf(obj) or pd.isna(obj):
-                        return "N/A"
-                    return obj
-                except:
-                    return "N/A"
-            elif pd.isna(obj):
+        # orjson encodes native types in C; only numpy scalars and other exotic values reach this hook
+        def json_default(obj):
+            if isinstance(obj, np.integer):
+                return int(obj)
+            elif isinstance(obj, np.floating):
+                value = float(obj)
+                return value if np.isfinite(value) else "N/A"
+            elif obj is pd.NaT:
                 return "N/A"
-            elif obj is None:
-                return "N/A"
-            elif isinstance(obj, str):
-                if obj.lower() in ['nan', 'inf', '-inf', 'none', 'null']:
-                    return "N/A"
-                return obj
-            else:
-                # Convert any other type to string as fallback
-                try:
-                    return str(obj)
-                except:
-                    return "N/A"
+            # Convert any other type to string as fallback
+            return str(obj)
         
-        # Clean analysis data
-        clean_analysis = clean_for_json(analysis)
-        
-        # Double-check: manually serialize to JSON string first
+        # Serialize once and send the bytes as-is; orjson raises on anything it cannot encode
         try:
-            # Test JSON serialization with strict mode
             response_data = {
                 "success": True,
                 "message": f"File '{file.filename}' uploaded and analyzed successfully!",
-                "analysis": clean_analysis
+                "analysis": analysis
             }
             
-            # Force JSON serialization to catch any remaining issues
-            json_str = json.dumps(response_data, allow_nan=False, ensure_ascii=False)
-            
-            # Parse back to ensure it's valid
-            verified_data = json.loads(json_str)
-            
-            return JSONResponse(content=verified_data)
+            json_bytes = orjson.dumps(response_data, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+            return Response(content=json_bytes, media_type="application/json")
             
-        except Exception as json_error:
+        except (TypeError, ValueError) as json_error:
             # If JSON still fails, return a simplified response
             return JSONResponse(content={
                 "success": False,
@@ -529,6 +609,9 @@ async def upload_file(file: UploadFile = File(...)):
             status_code=500,
             content={"error": f"Error processing file: {str(e)}"}
         )
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
 
 if __name__ == "__main__":
     import uvicorn
@@ -3,13 +3,21 @@ Risk Assessment Plugin - Advanced risk analysis with VaR and Monte Carlo simulat
 Demonstrates the plugin architecture's extensibility
 """
 
+import asyncio
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any
+from dataclasses import dataclass
 from datetime import datetime
 import logging
 from scipy import stats
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 # Import base plugin interface (this would be imported from the main application)
 import sys
 sys.path.append('../../../backend/app')
@@ -17,6 +25,110 @@ from core.plugin_manager import AnalysisPlugin, PluginManifest
 
 logger = logging.getLogger(__name__)
 
+# Trade fields used by the risk attribution breakdowns
+ATTRIBUTION_COLUMNS = ('symbol', 'type', 'open_time')
+
+# Central moments below this are floating-point noise (pandas' nanops cutoff)
+MOMENT_ZERO_TOLERANCE = 1e-14
+
+# Monte Carlo modes: fitted-Normal draws or the closed-form Normal
+MONTE_CARLO_MODES = ('normal', 'analytic')
+
+
+if NUMBA_AVAILABLE:
+    @njit
+    def _signed_sums(values):
+        """Count, sum and sum the squares of the negative and positive entries of values in a single compiled pass"""
+        loss_count = 0
+        loss_sum = 0.0
+        loss_sq = 0.0
+        profit_count = 0
+        profit_sum = 0.0
+        profit_sq = 0.0
+        for i in range(values.shape[0]):
+            value = float(values[i])
+            if value < 0:
+                loss_count += 1
+                loss_sum += value
+                loss_sq += value * value
+            elif value > 0:
+                profit_count += 1
+                profit_sum += value
+                profit_sq += value * value
+        return loss_count, loss_sum, loss_sq, profit_count, profit_sum, profit_sq
+else:
+    def _signed_sums(values):
+        """Count, sum and sum the squares of the negative and positive entries of values"""
+        losses = values[values < 0].astype(np.float64)
+        profits = values[values > 0].astype(np.float64)
+        return (losses.size, losses.sum(), np.dot(losses, losses),
+                profits.size, profits.sum(), np.dot(profits, profits))
+
+
+def _sample_std(count: int, total: float, total_sq: float) -> float:
+    """Sample standard deviation (ddof=1) from a count, sum and sum of squares; 0 for no values"""
+    if count == 0:
+        return 0
+    if count == 1:
+        return np.nan
+    return float(np.sqrt(max(total_sq - total * total / count, 0.0) / (count - 1)))
+
+
+def _to_float(value) -> float:
+    """float(value), or NaN when it is missing or not numeric (as pd.to_numeric(errors='coerce'))"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+@dataclass
+class Moments:
+    """Sample statistics of the returns shared by the risk helpers"""
+    mean: float
+    variance: float
+    skewness: float
+    kurtosis: float
+    minimum: float
+    maximum: float
+
+
+def _sample_moments(returns: np.ndarray) -> Moments:
+    """Bias-corrected sample moments, as pandas reports them, from one set of central-moment sums"""
+    n = returns.size
+    mean = returns.mean()
+    deviations = returns - mean
+    squared = deviations * deviations
+    m2 = squared.mean()
+    m3 = np.dot(squared, deviations) / n
+    m4 = np.dot(squared, squared) / n
+    
+    # Like pandas, treat a variance within floating-point error of zero as a constant series: skew and kurtosis 0
+    if m2 < MOMENT_ZERO_TOLERANCE:
+        skewness = kurtosis = 0.0
+    else:
+        # Population skewness/excess kurtosis with the small-sample corrections of stats.skew/kurtosis(bias=False)
+        g1 = m3 / m2 ** 1.5
+        g2 = m4 / m2 ** 2 - 3
+        skewness = float(g1 * np.sqrt(n * (n - 1)) / (n - 2))
+        kurtosis = float(((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3)))
+    return Moments(
+        mean=float(mean),
+        variance=float(m2 * n / (n - 1)),
+        skewness=skewness,
+        kurtosis=kurtosis,
+        minimum=float(returns.min()),
+        maximum=float(returns.max())
+    )
+
+
+def _sorted_percentile(sorted_values: np.ndarray, q):
+    """np.percentile with linear interpolation, for an array that is already sorted"""
+    position = np.asarray(q, dtype=np.float64) / 100 * (sorted_values.size - 1)
+    lower = np.floor(position).astype(np.intp)
+    upper = np.minimum(lower + 1, sorted_values.size - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
 
 class Plugin(AnalysisPlugin):
     """Advanced Risk Assessment Plugin"""
@@ -26,15 +138,27 @@ class Plugin(AnalysisPlugin):
         self.risk_free_rate = 0.02  # 2% annual risk-free rate
         self.confidence_levels = [0.95, 0.99]
         self.monte_carlo_simulations = 10000
+        self.monte_carlo_mode = 'normal'
+        self._set_confidence_levels(self.confidence_levels)
     
     async def initialize(self, config: Dict[str, Any]) -> None:
         """Initialize plugin with configuration"""
         self.risk_free_rate = config.get('risk_free_rate', 0.02)
-        self.confidence_levels = config.get('confidence_levels', [0.95, 0.99])
+        self._set_confidence_levels(config.get('confidence_levels', [0.95, 0.99]))
         self.monte_carlo_simulations = config.get('monte_carlo_simulations', 10000)
+        self.monte_carlo_mode = config.get('monte_carlo_mode', 'normal')
+        if self.monte_carlo_mode not in MONTE_CARLO_MODES:
+            logger.warning(f"Unknown monte_carlo_mode '{self.monte_carlo_mode}', using 'normal'")
+            self.monte_carlo_mode = 'normal'
         
         logger.info(f"Risk Assessment Plugin initialized with {len(self.confidence_levels)} confidence levels")
     
+    def _set_confidence_levels(self, confidence_levels: List[float]) -> None:
+        """Store the confidence levels with their tail probabilities and normal quantiles"""
+        self.confidence_levels = confidence_levels
+        self._alphas = 1 - np.asarray(confidence_levels, dtype=np.float64)
+        self._z_alphas = stats.norm.ppf(self._alphas)
+    
     async def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Perform advanced risk analysis"""
         
@@ -42,39 +166,60 @@ class Plugin(AnalysisPlugin):
         if not trades:
             return {"error": "No trades provided for risk analysis"}
         
-        # Convert to DataFrame for analysis
-        df = pd.DataFrame(trades)
-        
         # Ensure we have profit data
-        if 'profit' not in df.columns:
+        trade_keys = set().union(*trades)
+        if 'profit' not in trade_keys:
             return {"error": "No profit data available for risk analysis"}
         
-        # Convert profit to numeric
-        df['profit'] = pd.to_numeric(df['profit'], errors='coerce')
-        df = df.dropna(subset=['profit'])
+        # Read profits straight into a float64 buffer, dropping non-numeric values
+        profits = np.fromiter((_to_float(trade.get('profit')) for trade in trades), dtype=np.float64, count=len(trades))
+        valid = ~np.isnan(profits)
+        returns = profits[valid]
         
-        if len(df) < 10:
+        if returns.size < 10:
             return {"error": "Insufficient data for risk analysis (minimum 10 trades required)"}
         
+        # Only the columns the attribution breakdowns use go into the DataFrame
+        attribution_columns = [column for column in ATTRIBUTION_COLUMNS if column in trade_keys]
+        df = pd.DataFrame(trades, columns=attribution_columns)[valid]
+        df['profit'] = returns
+        
+        # The analyses are CPU-bound, so run them off the event loop
+        return await asyncio.to_thread(self._run_analyses, returns, df)
+    
+    def _run_analyses(self, returns: np.ndarray, df: pd.DataFrame) -> Dict[str, Any]:
+        """Run every risk analysis on the cleaned trades"""
+        
+        # Sorted copy of the profit array shared by the percentile-based analyses
+        sorted_returns = np.sort(returns)
+        
+        # Sample moments shared by the helpers
+        moments = _sample_moments(returns)
+        
+        # Downside and upside deviation from one pass of signed sums
+        loss_count, loss_sum, loss_sq, profit_count, profit_sum, profit_sq = _signed_sums(returns)
+        downside_deviation = _sample_std(loss_count, loss_sum, loss_sq)
+        upside_deviation = _sample_std(profit_count, profit_sum, profit_sq)
+        
         results = {}
         
         # Basic risk metrics
-        results['basic_metrics'] = await self._calculate_basic_risk_metrics(df)
+        results['basic_metrics'] = self._calculate_basic_risk_metrics(moments, downside_deviation, upside_deviation)
         
         # Value at Risk (VaR) analysis
-        results['var_analysis'] = await self._calculate_var(df)
+        results['var_analysis'] = self._calculate_var(moments, sorted_returns)
         
         # Monte Carlo simulation
-        results['monte_carlo'] = await self._monte_carlo_simulation(df)
+        results['monte_carlo'] = self._monte_carlo_simulation(moments)
         
         # Risk-adjusted returns
-        results['risk_adjusted_returns'] = await self._calculate_risk_adjusted_returns(df)
+        results['risk_adjusted_returns'] = self._calculate_risk_adjusted_returns(returns, moments, downside_deviation)
         
         # Tail risk analysis
-        results['tail_risk'] = await self._analyze_tail_risk(df)
+        results['tail_risk'] = self._analyze_tail_risk(returns, sorted_returns)
         
         # Risk attribution
-        results['risk_attribution'] = await self._analyze_risk_attribution(df)
+        results['risk_attribution'] = self._analyze_risk_attribution(df)
         
         return results
     
@@ -164,81 +309,93 @@ class Plugin(AnalysisPlugin):
         
         return insights
     
-    async def _calculate_basic_risk_metrics(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_basic_risk_metrics(self, moments: Moments, downside_deviation: float, upside_deviation: float) -> Dict[str, Any]:
         """Calculate basic risk metrics"""
         
-        returns = df['profit']
-        
         return {
-            'volatility': float(returns.std()),
-            'mean_return': float(returns.mean()),
-            'skewness': float(returns.skew()),
-            'kurtosis': float(returns.kurtosis()),
-            'max_loss': float(returns.min()),
-            'max_gain': float(returns.max()),
-            'downside_deviation': float(returns[returns < 0].std()) if len(returns[returns < 0]) > 0 else 0,
-            'upside_deviation': float(returns[returns > 0].std()) if len(returns[returns > 0]) > 0 else 0
+            'volatility': float(np.sqrt(moments.variance)),
+            'mean_return': moments.mean,
+            'skewness': moments.skewness,
+            'kurtosis': moments.kurtosis,
+            'max_loss': moments.minimum,
+            'max_gain': moments.maximum,
+            'downside_deviation': downside_deviation,
+            'upside_deviation': upside_deviation
         }
     
-    async def _calculate_var(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_var(self, moments: Moments, sorted_returns: np.ndarray) -> Dict[str, Any]:
         """Calculate Value at Risk using multiple methods"""
         
-        returns = df['profit']
         var_results = {}
         
-        for confidence in self.confidence_levels:
-            alpha = 1 - confidence
-            
-            # Historical VaR
-            historical_var = float(np.percentile(returns, alpha * 100))
-            
-            # Parametric VaR (assuming normal distribution)
-            mean = returns.mean()
-            std = returns.std()
-            parametric_var = float(mean + std * stats.norm.ppf(alpha))
-            
-            # Modified VaR (Cornish-Fisher expansion)
-            skew = returns.skew()
-            kurt = returns.kurtosis()
-            z_score = stats.norm.ppf(alpha)
-            z_cf = z_score + (z_score**2 - 1) * skew / 6 + (z_score**3 - 3*z_score) * kurt / 24
-            modified_var = float(mean + std * z_cf)
-            
+        # Distribution moments are shared by every confidence level
+        mean = moments.mean
+        std = np.sqrt(moments.variance)
+        skew = moments.skewness
+        kurt = moments.kurtosis
+        
+        # Evaluate all confidence levels at once, with the normal quantiles precomputed
+        z_scores = self._z_alphas
+        
+        # Historical VaR
+        historical_vars = _sorted_percentile(sorted_returns, self._alphas * 100)
+        
+        # Parametric VaR (assuming normal distribution)
+        parametric_vars = mean + std * z_scores
+        
+        # Modified VaR (Cornish-Fisher expansion)
+        z_cf = z_scores + (z_scores**2 - 1) * skew / 6 + (z_scores**3 - 3*z_scores) * kurt / 24
+        modified_vars = mean + std * z_cf
+        
+        for confidence, historical_var, parametric_var, modified_var in zip(
+            self.confidence_levels, historical_vars, parametric_vars, modified_vars
+        ):
+            historical_var = float(historical_var)
             var_results.update({
                 f'var_{int(confidence*100)}_historical': historical_var,
-                f'var_{int(confidence*100)}_parametric': parametric_var,
-                f'var_{int(confidence*100)}_modified': modified_var,
+                f'var_{int(confidence*100)}_parametric': float(parametric_var),
+                f'var_{int(confidence*100)}_modified': float(modified_var),
                 f'var_{int(confidence*100)}': historical_var  # Use historical as primary
             })
             
-            # Conditional VaR (Expected Shortfall)
-            conditional_var = float(returns[returns <= historical_var].mean()) if len(returns[returns <= historical_var]) > 0 else 0
+            # Conditional VaR (Expected Shortfall): mean of the sorted prefix at or below VaR
+            tail_count = np.searchsorted(sorted_returns, historical_var, side='right')
+            conditional_var = float(sorted_returns[:tail_count].mean()) if tail_count > 0 else 0
             var_results[f'cvar_{int(confidence*100)}'] = conditional_var
         
         return var_results
     
-    async def _monte_carlo_simulation(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _monte_carlo_simulation(self, moments: Moments) -> Dict[str, Any]:
         """Perform Monte Carlo simulation for risk assessment"""
         
-        returns = df['profit']
-        mean = returns.mean()
-        std = returns.std()
+        mean = moments.mean
+        std = np.sqrt(moments.variance)
+        percentiles = [1, 5, 10, 25, 50, 75, 90, 95, 99]
+        
+        # Normal draws only estimate the fitted Normal, so answer in closed form when asked to
+        if self.monte_carlo_mode == 'analytic' and std > 0:
+            return self._analytic_normal_summary(mean, std, percentiles)
         
-        # Generate random scenarios
-        np.random.seed(42)  # For reproducible results
-        simulated_returns = np.random.normal(mean, std, self.monte_carlo_simulations)
+        # Generate random scenarios with a fixed-seed PCG64 generator (reproducible, no global state)
+        rng = np.random.default_rng(42)
+        # float32 is ample for simulated draws and halves the memory the reductions walk
+        simulated_returns = rng.standard_normal(self.monte_carlo_simulations, dtype=np.float32)
+        simulated_returns *= np.float32(std)
+        simulated_returns += np.float32(mean)
         
-        # Calculate statistics
-        probability_of_loss = float(np.mean(simulated_returns < 0))
-        probability_of_profit = float(np.mean(simulated_returns > 0))
+        # Calculate statistics from one fused count/sum reduction over the draws
+        loss_count, loss_sum, _, profit_count, profit_sum, _ = _signed_sums(simulated_returns)
+        probability_of_loss = loss_count / simulated_returns.size
+        probability_of_profit = profit_count / simulated_returns.size
         
         # Expected values
-        expected_loss = float(np.mean(simulated_returns[simulated_returns < 0])) if np.any(simulated_returns < 0) else 0
-        expected_profit = float(np.mean(simulated_returns[simulated_returns > 0])) if np.any(simulated_returns > 0) else 0
+        expected_loss = float(loss_sum / loss_count) if loss_count else 0
+        expected_profit = float(profit_sum / profit_count) if profit_count else 0
         
-        # Percentiles
-        percentiles = [1, 5, 10, 25, 50, 75, 90, 95, 99]
-        percentile_values = {f'p{p}': float(np.percentile(simulated_returns, p)) for p in percentiles}
+        # Percentiles, read by index from the draws sorted once in place
+        simulated_returns.sort()
+        values = _sorted_percentile(simulated_returns, np.asarray(percentiles, dtype=np.float64))
+        percentile_values = {f'p{p}': float(v) for p, v in zip(percentiles, values)}
         
         return {
             'simulations': self.monte_carlo_simulations,
@@ -247,35 +404,58 @@ class Plugin(AnalysisPlugin):
             'expected_loss': expected_loss,
             'expected_profit': expected_profit,
             'percentiles': percentile_values,
-            'worst_case_1pct': float(np.percentile(simulated_returns, 1)),
-            'best_case_1pct': float(np.percentile(simulated_returns, 99))
+            'worst_case_1pct': percentile_values['p1'],
+            'best_case_1pct': percentile_values['p99']
+        }
+    
+    def _analytic_normal_summary(self, mean: float, std: float, percentiles: List[int]) -> Dict[str, Any]:
+        """Exact Monte Carlo statistics of N(mean, std), using truncated-Normal means for the expected values"""
+        
+        # Standardised break-even point and the Normal mass either side of it
+        a = -mean / std
+        probability_of_loss = float(stats.norm.cdf(a))
+        probability_of_profit = float(stats.norm.sf(a))
+        density = stats.norm.pdf(a)
+        
+        expected_loss = float(mean - std * density / probability_of_loss) if probability_of_loss > 0 else 0
+        expected_profit = float(mean + std * density / probability_of_profit) if probability_of_profit > 0 else 0
+        
+        values = mean + std * stats.norm.ppf(np.asarray(percentiles, dtype=np.float64) / 100)
+        percentile_values = {f'p{p}': float(v) for p, v in zip(percentiles, values)}
+        
+        return {
+            'simulations': 0,
+            'probability_of_loss': probability_of_loss,
+            'probability_of_profit': probability_of_profit,
+            'expected_loss': expected_loss,
+            'expected_profit': expected_profit,
+            'percentiles': percentile_values,
+            'worst_case_1pct': percentile_values['p1'],
+            'best_case_1pct': percentile_values['p99']
         }
     
-    async def _calculate_risk_adjusted_returns(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_risk_adjusted_returns(self, returns: np.ndarray, moments: Moments, downside_deviation: float) -> Dict[str, Any]:
         """Calculate various risk-adjusted return metrics"""
         
-        returns = df['profit']
+        # Scalars shared by every ratio, each computed once
+        mean = moments.mean
+        std = np.sqrt(moments.variance)
+        excess_mean = mean - (self.risk_free_rate / 252)  # Daily risk-free rate
         
         # Sharpe ratio
-        excess_returns = returns - (self.risk_free_rate / 252)  # Daily risk-free rate
-        sharpe_ratio = float(excess_returns.mean() / returns.std()) if returns.std() != 0 else 0
+        sharpe_ratio = float(excess_mean / std) if std != 0 else 0
         
         # Sortino ratio
-        downside_returns = returns[returns < 0]
-        downside_deviation = downside_returns.std() if len(downside_returns) > 0 else 0
-        sortino_ratio = float(excess_returns.mean() / downside_deviation) if downside_deviation != 0 else 0
+        sortino_ratio = float(excess_mean / downside_deviation) if downside_deviation != 0 else 0
         
         # Calmar ratio
-        equity_curve = returns.cumsum()
-        running_max = equity_curve.cummax()
-        drawdown = equity_curve - running_max
+        equity_curve = np.cumsum(returns)
+        drawdown = equity_curve - np.maximum.accumulate(equity_curve)
         max_drawdown = abs(drawdown.min())
-        calmar_ratio = float(returns.mean() / max_drawdown) if max_drawdown != 0 else 0
+        calmar_ratio = float(mean / max_drawdown) if max_drawdown != 0 else 0
         
-        # Information ratio
-        benchmark_return = 0  # Assume benchmark is 0
-        tracking_error = returns.std()
-        information_ratio = float((returns.mean() - benchmark_return) / tracking_error) if tracking_error != 0 else 0
+        # Information ratio (benchmark assumed to be 0, so tracking error is the volatility)
+        information_ratio = float(mean / std) if std != 0 else 0
         
         return {
             'sharpe_ratio': sharpe_ratio,
@@ -283,42 +463,35 @@ class Plugin(AnalysisPlugin):
             'calmar_ratio': calmar_ratio,
             'information_ratio': information_ratio,
             'max_drawdown': float(max_drawdown),
-            'excess_return_mean': float(excess_returns.mean())
+            'excess_return_mean': float(excess_mean)
         }
     
-    async def _analyze_tail_risk(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_tail_risk(self, returns: np.ndarray, sorted_returns: np.ndarray) -> Dict[str, Any]:
         """Analyze tail risk characteristics"""
         
-        returns = df['profit']
-        
+
         # Define extreme loss threshold (bottom 5%)
-        extreme_loss_threshold = np.percentile(returns, 5)
-        extreme_losses = returns[returns <= extreme_loss_threshold]
+        extreme_loss_threshold = _sorted_percentile(sorted_returns, 5)
+        extreme_losses = sorted_returns[:np.searchsorted(sorted_returns, extreme_loss_threshold, side='right')]
         
         # Tail statistics
         tail_mean = float(extreme_losses.mean()) if len(extreme_losses) > 0 else 0
-        tail_std = float(extreme_losses.std()) if len(extreme_losses) > 0 else 0
+        # A single-trade tail has no sample std: NaN without numpy's degrees-of-freedom warning, as pandas gave
+        tail_std = float(extreme_losses.std(ddof=1)) if len(extreme_losses) > 1 else (np.nan if len(extreme_losses) == 1 else 0)
         extreme_loss_probability = float(len(extreme_losses) / len(returns))
         
-        # Maximum loss runs
-        consecutive_losses = 0
-        max_consecutive_losses = 0
-        loss_runs = []
-        current_run = 0
-        
-        for profit in returns:
-            if profit < 0:
-                current_run += 1
-                consecutive_losses += 1
-                max_consecutive_losses = max(max_consecutive_losses, consecutive_losses)
-            else:
-                if current_run > 0:
-                    loss_runs.append(current_run)
-                    current_run = 0
-                consecutive_losses = 0
-        
-        avg_loss_run = float(np.mean(loss_runs)) if loss_runs else 0
-        
+        # Maximum loss runs, from the edges of the padded loss mask
+        losses = returns < 0
+        edges = np.diff(np.concatenate(([False], losses, [False])).astype(np.int8))
+        run_starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1)
+        run_lengths = run_ends - run_starts
+        max_consecutive_losses = int(run_lengths.max(initial=0))
+
+        # Only runs closed by a non-losing trade count as completed loss runs
+        loss_runs = run_lengths[run_ends < len(losses)]
+        avg_loss_run = float(loss_runs.mean()) if loss_runs.size else 0
+
         return {
             'extreme_loss_threshold': float(extreme_loss_threshold),
             'extreme_loss_probability': extreme_loss_probability,
@@ -326,52 +499,50 @@ class Plugin(AnalysisPlugin):
             'tail_std': tail_std,
             'max_consecutive_losses': max_consecutive_losses,
             'avg_loss_run_length': avg_loss_run,
-            'total_loss_runs': len(loss_runs)
+            'total_loss_runs': int(loss_runs.size)
         }
     
-    async def _analyze_risk_attribution(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_risk_attribution(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze risk attribution by different factors"""
         
+        # Nothing to attribute without any of the breakdown columns
+        if not any(column in df.columns for column in ATTRIBUTION_COLUMNS):
+            return {}
+        
         attribution = {}
+        profits = df['profit']
+        total = len(df)
+        
+        def group_risk(keys: pd.Series, key_type=lambda key: key) -> Dict[Any, Dict[str, float]]:
+            """Volatility, 5% VaR and trade share per group in one groupby pass"""
+            grouped = profits.groupby(keys, sort=False)
+            volatility = grouped.std()
+            var_95 = grouped.quantile(0.05)
+            counts = grouped.size()
+            contributions = counts.to_numpy() / total
+            return {
+                key_type(key): {
+                    'volatility': float(vol),
+                    'var_95': float(var),
+                    'contribution': float(contribution)
+                }
+                for key, vol, var, contribution in zip(counts.index, volatility, var_95, contributions)
+            }
         
         # Risk by symbol (if available)
         if 'symbol' in df.columns:
-            symbol_risk = {}
-            for symbol in df['symbol'].unique():
-                symbol_data = df[df['symbol'] == symbol]['profit']
-                symbol_risk[symbol] = {
-                    'volatility': float(symbol_data.std()),
-                    'var_95': float(np.percentile(symbol_data, 5)),
-                    'contribution': float(len(symbol_data) / len(df))
-                }
-            attribution['by_symbol'] = symbol_risk
+            attribution['by_symbol'] = group_risk(df['symbol'])
         
         # Risk by trade type (if available)
         if 'type' in df.columns:
-            type_risk = {}
-            for trade_type in df['type'].unique():
-                type_data = df[df['type'] == trade_type]['profit']
-                type_risk[trade_type] = {
-                    'volatility': float(type_data.std()),
-                    'var_95': float(np.percentile(type_data, 5)),
-                    'contribution': float(len(type_data) / len(df))
-                }
-            attribution['by_type'] = type_risk
+            attribution['by_type'] = group_risk(df['type'])
         
-        # Risk by time periods (if time data available)
+        # Risk by time periods (if time data available); trades without a time are skipped
         if 'open_time' in df.columns:
-            df['hour'] = pd.to_datetime(df['open_time']).dt.hour
-            hourly_risk = {}
-            
-            for hour in df['hour'].unique():
-                if pd.notna(hour):
-                    hour_data = df[df['hour'] == hour]['profit']
-                    hourly_risk[int(hour)] = {
-                        'volatility': float(hour_data.std()),
-                        'var_95': float(np.percentile(hour_data, 5)),
-                        'contribution': float(len(hour_data) / len(df))
-                    }
-            attribution['by_hour'] = hourly_risk
+            open_times = pd.to_datetime(df['open_time'], cache=True).dt.tz_localize(None)
+            hour_stamps = open_times.to_numpy(dtype='datetime64[h]')
+            hours = pd.Series(hour_stamps.astype(np.int64) % 24, index=df.index).where(~np.isnat(hour_stamps))
+            attribution['by_hour'] = group_risk(hours, key_type=int)
         
         return attribution
     
@@ -3,12 +3,23 @@ cTrader Data Source Plugin - Parse cTrader trading platform exports
 Demonstrates data source plugin extensibility
 """
 
+import asyncio
 import pandas as pd
+import numpy as np
 import io
-from typing import Dict, Any, List
+import re
+import hashlib
+import importlib.util
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import logging
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 # Import base plugin interface
 import sys
 sys.path.append('../../../backend/app')
@@ -16,6 +27,184 @@ from core.plugin_manager import DataSourcePlugin, PluginManifest
 
 logger = logging.getLogger(__name__)
 
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# CSV exports larger than this (in bytes) are read with the multi-threaded pyarrow engine
+PYARROW_CSV_THRESHOLD = 1_000_000
+
+# cTrader column mappings
+CTRADER_COLUMNS = {
+    'Position ID': 'ticket',
+    'Symbol': 'symbol',
+    'Side': 'type',
+    'Volume': 'size',
+    'Entry Price': 'open_price',
+    'Exit Price': 'close_price',
+    'Entry Time': 'open_time',
+    'Exit Time': 'close_time',
+    'Gross P&L': 'profit',
+    'Commission': 'commission',
+    'Swap': 'swap',
+    'Net P&L': 'net_profit',
+    'Stop Loss': 'stop_loss',
+    'Take Profit': 'take_profit'
+}
+
+# Alternative column names cTrader might use
+ALTERNATIVE_COLUMNS = {
+    'Deal': 'ticket',
+    'Deal ID': 'ticket',
+    'Position': 'ticket',
+    'Instrument': 'symbol',
+    'Currency Pair': 'symbol',
+    'Direction': 'type',
+    'Trade Type': 'type',
+    'Quantity': 'size',
+    'Amount': 'size',
+    'Open Price': 'open_price',
+    'Close Price': 'close_price',
+    'Open Time': 'open_time',
+    'Close Time': 'close_time',
+    'Opening Time': 'open_time',
+    'Closing Time': 'close_time',
+    'P&L': 'profit',
+    'Profit/Loss': 'profit',
+    'PnL': 'profit',
+    'Fees': 'commission',
+    'Rollover': 'swap',
+    'Interest': 'swap'
+}
+
+# Fuzzy column rules, tried in order: a column name matches when it contains
+# at least one keyword from every group
+FUZZY_COLUMN_RULES = (
+    ((('id',), ('position', 'deal')), 'ticket'),
+    ((('symbol', 'instrument', 'pair'),), 'symbol'),
+    ((('side', 'direction', 'type'),), 'type'),
+    ((('volume', 'quantity', 'amount'),), 'size'),
+    ((('entry',), ('price',)), 'open_price'),
+    ((('exit',), ('price',)), 'close_price'),
+    ((('entry',), ('time',)), 'open_time'),
+    ((('exit',), ('time',)), 'close_time'),
+    ((('p&l', 'pnl', 'profit'),), 'profit'),
+)
+
+DATETIME_COLUMNS = ('open_time', 'close_time')
+NUMERIC_COLUMNS = ('size', 'open_price', 'close_price', 'stop_loss', 'take_profit',
+                   'commission', 'swap', 'profit', 'net_profit')
+
+# Trade rows missing any of these columns are dropped
+ESSENTIAL_COLUMNS = ('ticket', 'open_time', 'type', 'size', 'symbol', 'open_price')
+
+# Trade type spellings cTrader exports use, standardized to buy/sell
+TRADE_TYPE_MAPPING = {
+    'buy': 'buy', 'long': 'buy', 'b': 'buy',
+    'sell': 'sell', 'short': 'sell', 's': 'sell'
+}
+TRADE_TYPES = pd.Index(['buy', 'sell'])
+
+# Pairs quoted to 2 decimal places (pip = 0.01) rather than 4
+TWO_DECIMAL_PAIR_RE = re.compile(r'JPY|HUF')
+
+# Header keywords (lowercase) whose presence marks a CSV / Excel export as cTrader data
+CTRADER_CSV_INDICATORS = (
+    'position id', 'deal', 'deal id',
+    'symbol', 'instrument', 'currency pair',
+    'side', 'direction', 'trade type',
+    'volume', 'quantity', 'amount',
+    'entry price', 'open price',
+    'entry time', 'open time', 'opening time',
+    'gross p&l', 'net p&l', 'p&l', 'pnl'
+)
+CTRADER_EXCEL_INDICATORS = (
+    'position id', 'deal', 'symbol', 'side', 'volume',
+    'entry price', 'entry time', 'gross p&l'
+)
+
+# Optional Rust xlsx reader (pip install python-calamine); openpyxl is used without it
+CALAMINE_AVAILABLE = importlib.util.find_spec("python_calamine") is not None
+
+
+def _count_indicators(columns: List[str], indicators) -> int:
+    """Number of indicators found in any column name: one substring search each over the joined headers"""
+    header_text = "\n".join(col.strip().lower() for col in columns)
+    return sum(1 for indicator in indicators if indicator in header_text)
+
+
+def _header_line_index(file_data: bytes) -> int:
+    """Raw line number of the header row, which pandas finds by skipping blank lines"""
+    line_number = 0
+    start = 0
+    while start < len(file_data):
+        end = file_data.find(b'\n', start)
+        if end == -1:
+            end = len(file_data)
+        if file_data[start:end].strip():
+            return line_number
+        line_number += 1
+        start = end + 1
+    return 0
+
+
+def _read_csv(file_data: bytes) -> pd.DataFrame:
+    """Read a CSV export, using the pyarrow engine for large files when it is installed"""
+    if PYARROW_AVAILABLE and len(file_data) > PYARROW_CSV_THRESHOLD:
+        try:
+            # pyarrow does not de-duplicate headers, so take the names pandas would assign
+            names = pd.read_csv(io.BytesIO(file_data), nrows=0).columns.tolist()
+            # pyarrow's skiprows counts raw lines, blank ones included, so skip past the header's actual line
+            return pd.read_csv(io.BytesIO(file_data), engine='pyarrow', header=None, names=names,
+                               skiprows=_header_line_index(file_data) + 1)
+        except Exception:
+            pass  # Fall back to the C engine for dialects pyarrow rejects
+    return pd.read_csv(io.BytesIO(file_data))
+
+
+def _read_excel(file_data: bytes, **kwargs) -> pd.DataFrame:
+    """Read an Excel export, using the calamine engine when it is installed"""
+    if CALAMINE_AVAILABLE:
+        try:
+            return pd.read_excel(io.BytesIO(file_data), engine='calamine', **kwargs)
+        except Exception:
+            pass  # pandas < 2.2 has no calamine engine; openpyxl reads the workbook instead
+    return pd.read_excel(io.BytesIO(file_data), **kwargs)
+
+
+if NUMBA_AVAILABLE:
+    @njit
+    def _pips_kernel(open_price, close_price, is_jpy, is_buy, out):
+        """Write signed pip moves into out in one compiled pass; missing prices give NaN"""
+        for i in range(open_price.shape[0]):
+            multiplier = 100.0 if is_jpy[i] else 10000.0
+            direction = 1.0 if is_buy[i] else -1.0
+            out[i] = direction * (close_price[i] - open_price[i]) * multiplier
+else:
+    def _pips_kernel(open_price, close_price, is_jpy, is_buy, out):
+        """Write signed pip moves into out; missing prices give NaN"""
+        np.multiply(np.where(is_buy, 1.0, -1.0) * (close_price - open_price), np.where(is_jpy, 100.0, 10000.0), out=out)
+
+
+def _infer_datetime_format(sample: Any) -> Optional[str]:
+    """Datetime format for a sample timestamp string: strptime for slash dates, ISO8601, or None to let pandas infer"""
+    if not isinstance(sample, str):
+        return None
+    
+    date_part, _, time_part = sample.strip().partition(' ')
+    if '/' in date_part:
+        # cTrader writes day-first dates; a leading 4-digit year means year-first
+        date_format = '%Y/%m/%d' if len(date_part.split('/')[0]) == 4 else '%d/%m/%Y'
+    elif '-' in date_part and len(date_part.split('-')[0]) == 4:
+        return 'ISO8601'
+    else:
+        return None
+    
+    if not time_part:
+        return date_format
+    time_format = '%H:%M:%S' if time_part.count(':') == 2 else '%H:%M'
+    if '.' in time_part:
+        time_format += '.%f'
+    return f'{date_format} {time_format}'
+
 
 class Plugin(DataSourcePlugin):
     """cTrader Data Source Plugin"""
@@ -24,48 +213,12 @@ class Plugin(DataSourcePlugin):
         super().__init__(manifest)
         self.supported_formats = ['.csv', '.xlsx']
         
-        # cTrader column mappings
-        self.ctrader_columns = {
-            'Position ID': 'ticket',
-            'Symbol': 'symbol',
-            'Side': 'type',
-            'Volume': 'size',
-            'Entry Price': 'open_price',
-            'Exit Price': 'close_price',
-            'Entry Time': 'open_time',
-            'Exit Time': 'close_time',
-            'Gross P&L': 'profit',
-            'Commission': 'commission',
-            'Swap': 'swap',
-            'Net P&L': 'net_profit',
-            'Stop Loss': 'stop_loss',
-            'Take Profit': 'take_profit'
-        }
+        # Digest of the last file validate() recognised as Excel, so parse() can skip the CSV attempt
+        self._validated_excel = None
         
-        # Alternative column names cTrader might use
-        self.alternative_columns = {
-            'Deal': 'ticket',
-            'Deal ID': 'ticket',
-            'Position': 'ticket',
-            'Instrument': 'symbol',
-            'Currency Pair': 'symbol',
-            'Direction': 'type',
-            'Trade Type': 'type',
-            'Quantity': 'size',
-            'Amount': 'size',
-            'Open Price': 'open_price',
-            'Close Price': 'close_price',
-            'Open Time': 'open_time',
-            'Close Time': 'close_time',
-            'Opening Time': 'open_time',
-            'Closing Time': 'close_time',
-            'P&L': 'profit',
-            'Profit/Loss': 'profit',
-            'PnL': 'profit',
-            'Fees': 'commission',
-            'Rollover': 'swap',
-            'Interest': 'swap'
-        }
+        # Column mappings, shared by every instance
+        self.ctrader_columns = CTRADER_COLUMNS
+        self.alternative_columns = ALTERNATIVE_COLUMNS
     
     async def initialize(self, config: Dict[str, Any]) -> None:
         """Initialize plugin with configuration"""
@@ -74,27 +227,18 @@ class Plugin(DataSourcePlugin):
     async def validate(self, file_data: bytes) -> bool:
         """Validate if file is a cTrader export"""
         
+        # Platform names near the top of the file identify it without any parsing
+        head_bytes = file_data[:4096].lower()
+        if b'ctrader' in head_bytes or b'spotware' in head_bytes:
+            logger.info("cTrader format detected by header bytes")
+            return True
+        
         try:
-            # Try to read as CSV first
-            df = pd.read_csv(io.BytesIO(file_data))
-            
-            # Check for cTrader-specific column patterns
-            columns = [col.strip() for col in df.columns]
+            # Try to read as CSV first; the header and first rows are all the checks need
+            df = pd.read_csv(io.BytesIO(file_data), nrows=5)
             
-            # Look for characteristic cTrader columns
-            ctrader_indicators = [
-                'Position ID', 'Deal', 'Deal ID',
-                'Symbol', 'Instrument', 'Currency Pair',
-                'Side', 'Direction', 'Trade Type',
-                'Volume', 'Quantity', 'Amount',
-                'Entry Price', 'Open Price',
-                'Entry Time', 'Open Time', 'Opening Time',
-                'Gross P&L', 'Net P&L', 'P&L', 'PnL'
-            ]
-            
-            # Check if we have at least 3 characteristic columns
-            matches = sum(1 for indicator in ctrader_indicators 
-                         if any(indicator.lower() in col.lower() for col in columns))
+            # Check if we have at least 3 characteristic cTrader columns
+            matches = _count_indicators(df.columns, CTRADER_CSV_INDICATORS)
             
             if matches >= 3:
                 logger.info(f"cTrader format detected with {matches} matching columns")
@@ -113,18 +257,13 @@ class Plugin(DataSourcePlugin):
             
             # Try Excel format
             try:
-                df = pd.read_excel(io.BytesIO(file_data))
-                columns = [col.strip() for col in df.columns]
-                
-                ctrader_indicators = [
-                    'Position ID', 'Deal', 'Symbol', 'Side', 'Volume',
-                    'Entry Price', 'Entry Time', 'Gross P&L'
-                ]
+                df = _read_excel(file_data, nrows=0)
+                matches = _count_indicators(df.columns, CTRADER_EXCEL_INDICATORS)
                 
-                matches = sum(1 for indicator in ctrader_indicators 
-                             if any(indicator.lower() in col.lower() for col in columns))
-                
-                return matches >= 3
+                if matches >= 3:
+                    self._validated_excel = hashlib.blake2b(file_data, digest_size=16).digest()
+                    return True
+                return False
                 
             except Exception as e2:
                 logger.debug(f"Excel validation failed: {e2}")
@@ -133,13 +272,25 @@ class Plugin(DataSourcePlugin):
     async def parse(self, file_data: bytes) -> Dict[str, Any]:
         """Parse cTrader export file"""
         
+        # Reading and cleaning are CPU-bound, so run them off the event loop
+        return await asyncio.to_thread(self._parse_sync, file_data)
+    
+    def _parse_sync(self, file_data: bytes) -> Dict[str, Any]:
+        """Read, clean and extract a cTrader export"""
+        
         try:
-            # Try CSV first
-            try:
-                df = pd.read_csv(io.BytesIO(file_data))
-            except:
-                # Fallback to Excel
-                df = pd.read_excel(io.BytesIO(file_data))
+            # Files validate() already recognised as Excel skip the CSV attempt
+            validated_excel = self._validated_excel
+            self._validated_excel = None
+            if validated_excel is not None and validated_excel == hashlib.blake2b(file_data, digest_size=16).digest():
+                df = _read_excel(file_data)
+            else:
+                # Try CSV first
+                try:
+                    df = _read_csv(file_data)
+                except:
+                    # Fallback to Excel
+                    df = _read_excel(file_data)
             
             logger.info(f"Loaded cTrader data with {len(df)} rows and columns: {list(df.columns)}")
             
@@ -147,14 +298,14 @@ class Plugin(DataSourcePlugin):
             df.columns = [col.strip() for col in df.columns]
             
             # Map cTrader columns to standard format
-            df_standardized = await self._standardize_columns(df)
+            df_standardized = self._standardize_columns(df)
             
             # Clean and validate data
-            df_clean = await self._clean_data(df_standardized)
+            df_clean = self._clean_data(df_standardized)
             
             # Extract trades and metadata
-            trades = await self._extract_trades(df_clean)
-            metadata = await self._extract_metadata(df_clean)
+            trades = self._extract_trades(df_clean)
+            metadata = self._extract_metadata(df_clean)
             
             return {
                 "trades": trades,
@@ -194,10 +345,9 @@ class Plugin(DataSourcePlugin):
             "alternative_mappings": self.alternative_columns
         }
     
-    async def _standardize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _standardize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """Standardize cTrader column names to internal format"""
         
-        df_renamed = df.copy()
         columns_mapped = {}
         
         # First pass: exact matches
@@ -206,9 +356,11 @@ class Plugin(DataSourcePlugin):
                 columns_mapped[ctrader_col] = standard_col
         
         # Second pass: alternative names
+        used_targets = set(columns_mapped.values())
         for alt_col, standard_col in self.alternative_columns.items():
-            if alt_col in df.columns and standard_col not in columns_mapped.values():
+            if alt_col in df.columns and standard_col not in used_targets:
                 columns_mapped[alt_col] = standard_col
+                used_targets.add(standard_col)
         
         # Third pass: fuzzy matching for similar column names
         remaining_columns = [col for col in df.columns if col not in columns_mapped]
@@ -216,145 +368,120 @@ class Plugin(DataSourcePlugin):
         for remaining_col in remaining_columns:
             remaining_lower = remaining_col.lower().strip()
             
-            # Try to match against standard names
-            if 'id' in remaining_lower and ('position' in remaining_lower or 'deal' in remaining_lower):
-                if 'ticket' not in columns_mapped.values():
-                    columns_mapped[remaining_col] = 'ticket'
-            elif 'symbol' in remaining_lower or 'instrument' in remaining_lower or 'pair' in remaining_lower:
-                if 'symbol' not in columns_mapped.values():
-                    columns_mapped[remaining_col] = 'symbol'
-            elif 'side' in remaining_lower or 'direction' in remaining_lower or 'type' in remaining_lower:
-                if 'type' not in columns_mapped.values():
-                    columns_mapped[remaining_col] = 'type'
-            elif 'volume' in remaining_lower or 'quantity' in remaining_lower or 'amount' in remaining_lower:
-                if 'size' not in columns_mapped.values():
-                    columns_mapped[remaining_col] = 'size'
-            elif 'entry' in remaining_lower and 'price' in remaining_lower:
-                if 'open_price' not in columns_mapped.values():
-                    columns_mapped[remaining_col] = 'open_price'
-            elif 'exit' in remaining_lower and 'price' in remaining_lower:
-                if 'close_price' not in columns_mapped.values():
-                    columns_mapped[remaining_col] = 'close_price'
-            elif 'entry' in remaining_lower and 'time' in remaining_lower:
-                if 'open_time' not in columns_mapped.values():
-                    columns_mapped[remaining_col] = 'open_time'
-            elif 'exit' in remaining_lower and 'time' in remaining_lower:
-                if 'close_time' not in columns_mapped.values():
-                    columns_mapped[remaining_col] = 'close_time'
-            elif 'p&l' in remaining_lower or 'pnl' in remaining_lower or 'profit' in remaining_lower:
-                if 'profit' not in columns_mapped.values():
-                    columns_mapped[remaining_col] = 'profit'
-        
-        # Apply column mappings
-        df_renamed = df_renamed.rename(columns=columns_mapped)
+            # The first rule the name satisfies decides it, even when its target is already taken
+            for keyword_groups, standard_col in FUZZY_COLUMN_RULES:
+                if all(any(keyword in remaining_lower for keyword in group) for group in keyword_groups):
+                    if standard_col not in used_targets:
+                        columns_mapped[remaining_col] = standard_col
+                        used_targets.add(standard_col)
+                    break
+        
+        # Apply column mappings on the parsed frame itself
+        df.rename(columns=columns_mapped, inplace=True)
         
         logger.info(f"Mapped {len(columns_mapped)} columns: {columns_mapped}")
         
-        return df_renamed
+        return df
     
-    async def _clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and validate cTrader data"""
         
-        df_clean = df.copy()
+        # Every stage works on the parsed frame in place; only the final row filter copies
         
         # Convert data types
-        df_clean = await self._convert_data_types(df_clean)
+        df_clean = self._convert_data_types(df)
         
         # Handle missing values
-        df_clean = await self._handle_missing_values(df_clean)
-        
-        # Remove invalid trades
-        df_clean = await self._remove_invalid_trades(df_clean)
+        df_clean = self._handle_missing_values(df_clean)
         
         # Calculate additional fields
-        df_clean = await self._calculate_additional_fields(df_clean)
+        df_clean = self._calculate_additional_fields(df_clean)
+        
+        # Remove invalid trades
+        df_clean = self._remove_invalid_trades(df_clean)
         
         logger.info(f"Cleaned cTrader data: {len(df_clean)} valid trades")
         
         return df_clean
     
-    async def _convert_data_types(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _convert_data_types(self, df: pd.DataFrame) -> pd.DataFrame:
         """Convert columns to appropriate data types"""
         
-        df_converted = df.copy()
-        
         # Convert datetime columns
-        datetime_columns = ['open_time', 'close_time']
-        for col in datetime_columns:
-            if col in df_converted.columns:
-                # cTrader often uses specific datetime formats
-                df_converted[col] = pd.to_datetime(df_converted[col], errors='coerce', 
-                                                  format='%d/%m/%Y %H:%M:%S', dayfirst=True)
-                # Try alternative formats if first attempt failed
-                if df_converted[col].isna().all():
-                    df_converted[col] = pd.to_datetime(df_converted[col], errors='coerce')
+        for col in DATETIME_COLUMNS:
+            if col in df.columns:
+                # cTrader uses a few datetime formats; detect it from the first timestamp and parse once,
+                # converting each distinct timestamp string only once
+                first_valid = df[col].first_valid_index()
+                sample = df[col].loc[first_valid] if first_valid is not None else None
+                df[col] = pd.to_datetime(df[col], errors='coerce', format=_infer_datetime_format(sample),
+                                         dayfirst=True, cache=True)
         
         # Convert numeric columns
-        numeric_columns = ['size', 'open_price', 'close_price', 'stop_loss', 'take_profit',
-                          'commission', 'swap', 'profit', 'net_profit']
-        for col in numeric_columns:
-            if col in df_converted.columns:
-                df_converted[col] = pd.to_numeric(df_converted[col], errors='coerce')
+        for col in NUMERIC_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
         
         # Convert trade type - cTrader uses "Buy"/"Sell"
-        if 'type' in df_converted.columns:
-            df_converted['type'] = df_converted['type'].astype(str).str.lower()
-            # Standardize trade types
-            type_mapping = {
-                'buy': 'buy', 'long': 'buy', 'b': 'buy',
-                'sell': 'sell', 'short': 'sell', 's': 'sell'
-            }
-            df_converted['type'] = df_converted['type'].map(type_mapping)
+        if 'type' in df.columns:
+            types = df['type'].astype(str).str.lower().astype('category')
+            # Standardize trade types on the few distinct spellings, then remap every row's code at once;
+            # unknown spellings get code -1 (missing)
+            category_codes = TRADE_TYPES.get_indexer(types.cat.categories.map(TRADE_TYPE_MAPPING))
+            df['type'] = pd.Categorical.from_codes(category_codes[types.cat.codes.to_numpy()], categories=TRADE_TYPES)
         
         # Convert ticket to string
-        if 'ticket' in df_converted.columns:
-            df_converted['ticket'] = df_converted['ticket'].astype(str)
+        if 'ticket' in df.columns:
+            df['ticket'] = df['ticket'].astype(str)
         
-        return df_converted
+        # Symbols repeat across many trades, so string work downstream runs once per distinct symbol
+        if 'symbol' in df.columns:
+            df['symbol'] = df['symbol'].astype('category')
+        
+        return df
     
-    async def _handle_missing_values(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _handle_missing_values(self, df: pd.DataFrame) -> pd.DataFrame:
         """Handle missing and invalid values"""
         
-        df_handled = df.copy()
-        
         # Fill missing stop loss and take profit with None/0
         for col in ['stop_loss', 'take_profit']:
-            if col in df_handled.columns:
-                df_handled[col] = df_handled[col].fillna(0)
+            if col in df.columns:
+                df[col] = df[col].fillna(0)
         
         # Fill missing commission and swap with 0
         for col in ['commission', 'swap']:
-            if col in df_handled.columns:
-                df_handled[col] = df_handled[col].fillna(0)
+            if col in df.columns:
+                df[col] = df[col].fillna(0)
         
         # Use net_profit if available and profit is missing
-        if 'net_profit' in df_handled.columns and 'profit' in df_handled.columns:
-            df_handled['profit'] = df_handled['profit'].fillna(df_handled['net_profit'])
+        if 'net_profit' in df.columns and 'profit' in df.columns:
+            df['profit'] = df['profit'].fillna(df['net_profit'])
         
-        return df_handled
+        return df
     
-    async def _remove_invalid_trades(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _remove_invalid_trades(self, df: pd.DataFrame) -> pd.DataFrame:
         """Remove trades with invalid data"""
         
         initial_count = len(df)
         
         # Remove trades with missing essential data
-        essential_columns = ['ticket', 'open_time', 'type', 'size', 'symbol', 'open_price']
-        available_essential = [col for col in essential_columns if col in df.columns]
-        
-        df_valid = df.dropna(subset=available_essential)
+        available_essential = [col for col in ESSENTIAL_COLUMNS if col in df.columns]
+        valid = df[available_essential].notna().all(axis=1)
         
         # Remove trades with invalid sizes
-        if 'size' in df_valid.columns:
-            df_valid = df_valid[df_valid['size'] > 0]
+        if 'size' in df.columns:
+            valid &= df['size'] > 0
         
         # Remove trades with invalid prices
-        if 'open_price' in df_valid.columns:
-            df_valid = df_valid[df_valid['open_price'] > 0]
+        if 'open_price' in df.columns:
+            valid &= df['open_price'] > 0
         
         # Remove trades with invalid types
-        if 'type' in df_valid.columns:
-            df_valid = df_valid[df_valid['type'].isin(['buy', 'sell'])]
+        if 'type' in df.columns:
+            valid &= df['type'].isin(TRADE_TYPES)
+        
+        # Apply all the checks as one mask, copying the surviving rows once
+        df_valid = df[valid]
         
         removed_count = initial_count - len(df_valid)
         if removed_count > 0:
@@ -362,69 +489,106 @@ class Plugin(DataSourcePlugin):
         
         return df_valid
     
-    async def _calculate_additional_fields(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _calculate_additional_fields(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calculate additional fields like duration, pips, etc."""
         
-        df_calc = df.copy()
-        
         # Calculate trade duration in minutes
-        if 'close_time' in df_calc.columns and 'open_time' in df_calc.columns:
-            mask = df_calc['close_time'].notna() & df_calc['open_time'].notna()
+        if 'close_time' in df.columns and 'open_time' in df.columns:
+            mask = df['close_time'].notna() & df['open_time'].notna()
             if mask.any():
-                df_calc.loc[mask, 'duration'] = (
-                    df_calc.loc[mask, 'close_time'] - df_calc.loc[mask, 'open_time']
+                df.loc[mask, 'duration'] = (
+                    df.loc[mask, 'close_time'] - df.loc[mask, 'open_time']
                 ).dt.total_seconds() / 60
         
         # Calculate pips (simplified calculation)
-        if all(col in df_calc.columns for col in ['close_price', 'open_price', 'type', 'symbol']):
-            for idx in df_calc.index:
-                if pd.notna(df_calc.loc[idx, 'close_price']) and pd.notna(df_calc.loc[idx, 'open_price']):
-                    symbol = str(df_calc.loc[idx, 'symbol']).upper()
-                    
-                    # Determine pip multiplier based on currency pair
-                    if 'JPY' in symbol or 'HUF' in symbol:
-                        pip_multiplier = 100  # 2 decimal places
-                    else:
-                        pip_multiplier = 10000  # 4 decimal places
-                    
-                    # Calculate pips based on trade direction
-                    if df_calc.loc[idx, 'type'] == 'buy':
-                        pips = (df_calc.loc[idx, 'close_price'] - df_calc.loc[idx, 'open_price']) * pip_multiplier
-                    else:
-                        pips = (df_calc.loc[idx, 'open_price'] - df_calc.loc[idx, 'close_price']) * pip_multiplier
-                    
-                    df_calc.loc[idx, 'pips'] = pips
-        
-        return df_calc
+        if all(col in df.columns for col in ['close_price', 'open_price', 'type', 'symbol']):
+            symbols = df['symbol'].cat
+            
+            # Pip multiplier depends on the currency pair (2 decimal places for JPY/HUF, 4 otherwise)
+            # and the sign on the trade direction; pairs are classified per category, and the
+            # trailing False covers missing symbols (code -1)
+            jpy_categories = symbols.categories.astype(str).str.upper().str.contains(TWO_DECIMAL_PAIR_RE)
+            is_jpy = np.append(np.asarray(jpy_categories, dtype=bool), False)[symbols.codes.to_numpy()]
+            is_buy = (df['type'] == 'buy').to_numpy(dtype=bool)
+            pips = np.empty(len(df), dtype=np.float64)
+            _pips_kernel(df['open_price'].to_numpy(dtype=np.float64), df['close_price'].to_numpy(dtype=np.float64),
+                         is_jpy, is_buy, pips)
+            df['pips'] = pips
+        
+        return df
     
-    async def _extract_trades(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _extract_trades(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Extract trades from cleaned DataFrame"""
         
-        trades = []
-        
-        for _, row in df.iterrows():
-            trade = {
-                'ticket': str(row.get('ticket', '')),
-                'open_time': row['open_time'].isoformat() if pd.notna(row.get('open_time')) else None,
-                'close_time': row['close_time'].isoformat() if pd.notna(row.get('close_time')) else None,
-                'type': row.get('type', ''),
-                'size': float(row.get('size', 0)),
-                'symbol': str(row.get('symbol', '')),
-                'open_price': float(row.get('open_price', 0)),
-                'close_price': float(row['close_price']) if pd.notna(row.get('close_price')) else None,
-                'stop_loss': float(row['stop_loss']) if pd.notna(row.get('stop_loss', 0)) and row.get('stop_loss', 0) != 0 else None,
-                'take_profit': float(row['take_profit']) if pd.notna(row.get('take_profit', 0)) and row.get('take_profit', 0) != 0 else None,
-                'commission': float(row.get('commission', 0)),
-                'swap': float(row.get('swap', 0)),
-                'profit': float(row.get('profit', 0)),
-                'duration': int(row['duration']) if pd.notna(row.get('duration')) else None,
-                'pips': float(row['pips']) if pd.notna(row.get('pips')) else None
-            }
-            trades.append(trade)
-        
-        return trades
+        def number(name: str) -> Any:
+            """Column as floats, or 0 for every trade when the export lacks it"""
+            return df[name].astype(np.float64) if name in df.columns else 0.0
+        
+        def optional(name: str, present=None, to_python=np.ndarray.tolist) -> Any:
+            """Column as Python values with None where missing, or None for every trade when absent"""
+            if name not in df.columns:
+                return None
+            values = df[name].to_numpy()
+            if present is None:
+                present = pd.notna(values)
+            result = np.full(len(values), None, dtype=object)
+            result[present] = to_python(values[present])
+            return result
+        
+        def isoformat(name: str) -> Any:
+            """Datetime column as ISO 8601 strings, None where missing"""
+            if name not in df.columns:
+                return None
+            times = df[name]
+            present = times.notna().to_numpy()
+            result = np.full(len(times), None, dtype=object)
+            valid_times = times[present]
+            if times.dt.tz is None and (valid_times.dt.floor('s') == valid_times).all():
+                # isoformat() of naive whole-second timestamps is exactly this pattern, formatted in C
+                result[present] = valid_times.dt.strftime('%Y-%m-%dT%H:%M:%S').to_numpy(dtype=object)
+            else:
+                result[present] = [value.isoformat() for value in valid_times]
+            return result
+        
+        def nonzero(name: str) -> Any:
+            """Price level column as floats, None where missing or unset (0)"""
+            if name not in df.columns:
+                return None
+            values = df[name]
+            return optional(name, present=(values.notna() & (values != 0)).to_numpy())
+        
+        # Build every field column-wise, then emit all rows in one pass
+        trades = pd.DataFrame({
+            'ticket': df['ticket'].astype(str) if 'ticket' in df.columns else '',
+            'open_time': isoformat('open_time'),
+            'close_time': isoformat('close_time'),
+            'type': df['type'] if 'type' in df.columns else '',
+            'size': number('size'),
+            'symbol': df['symbol'].astype(str) if 'symbol' in df.columns else '',
+            'open_price': number('open_price'),
+            'close_price': optional('close_price'),
+            'stop_loss': nonzero('stop_loss'),
+            'take_profit': nonzero('take_profit'),
+            'commission': number('commission'),
+            'swap': number('swap'),
+            'profit': number('profit'),
+            'duration': optional('duration', to_python=lambda values: values.astype(np.int64).tolist()),
+            'pips': optional('pips')
+        }, index=df.index, dtype=object)  # object dtype keeps None from being inferred as NaN
+        
+        if PYARROW_AVAILABLE:
+            import pyarrow as pa
+            try:
+                # Arrow builds the record dicts in C++, about twice as fast as to_dict('records');
+                # from_pandas=False keeps NaN values as NaN rather than turning them into None
+                arrays = [pa.array(trades[name].to_numpy(), from_pandas=False) for name in trades.columns]
+                return pa.Table.from_arrays(arrays, names=list(trades.columns)).to_pylist()
+            except pa.ArrowException:
+                pass  # Mixed-type columns Arrow cannot type; build the records with pandas
+        
+        return trades.to_dict(orient='records')
     
-    async def _extract_metadata(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _extract_metadata(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Extract metadata from cTrader data"""
         
         metadata = {
@@ -441,19 +605,11 @@ class Plugin(DataSourcePlugin):
         
         # Try to extract account currency from symbols
         if not df.empty and 'symbol' in df.columns:
-            symbols = df['symbol'].unique()
-            # Look for common base currencies in symbols
-            for symbol in symbols:
-                symbol_str = str(symbol).upper()
-                if symbol_str.endswith('USD'):
-                    metadata['currency'] = 'USD'
-                    break
-                elif symbol_str.endswith('EUR'):
-                    metadata['currency'] = 'EUR'
-                    break
-                elif symbol_str.endswith('GBP'):
-                    metadata['currency'] = 'GBP'
-                    break
+            # Look for common quote currencies: the first symbol (in order of appearance) ending in one decides
+            suffixes = pd.Series(df['symbol'].unique()).astype(str).str.upper().str[-3:]
+            currencies = suffixes[suffixes.isin(['USD', 'EUR', 'GBP'])]
+            if not currencies.empty:
+                metadata['currency'] = currencies.iloc[0]
         
         return metadata
     
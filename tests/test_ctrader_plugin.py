@@ -0,0 +1,49 @@
+"""cTrader data source plugin tests for CSV reading"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGIN_DIR = os.path.join(ROOT, 'plugins', 'data-sources', 'ctrader-plugin')
+sys.path.append(os.path.join(ROOT, 'backend', 'app'))
+
+spec = importlib.util.spec_from_file_location('ctrader_plugin', os.path.join(PLUGIN_DIR, 'plugin.py'))
+ctrader_plugin = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ctrader_plugin)
+
+HEADER = "Position ID,Symbol,Side,Volume,Entry Price,Exit Price,Entry Time,Exit Time,Gross P&L\n"
+ROW = "{i},EURUSD,Buy,1000,1.10000,1.10100,2024-01-02 10:00:00,2024-01-02 11:00:00,{profit}\n"
+
+
+def make_export(rows: int) -> bytes:
+    """cTrader CSV export with a blank line before the header"""
+    body = "".join(ROW.format(i=i + 1, profit=(i % 7) + 1) for i in range(rows))
+    return ("\n" + HEADER + body).encode()
+
+
+def make_plugin():
+    with open(os.path.join(PLUGIN_DIR, 'manifest.json')) as f:
+        return ctrader_plugin.Plugin(ctrader_plugin.PluginManifest(**json.load(f)))
+
+
+def test_read_csv_skips_blank_lines_before_header():
+    file_data = make_export(20000)
+    assert len(file_data) > ctrader_plugin.PYARROW_CSV_THRESHOLD
+    
+    df = ctrader_plugin._read_csv(file_data)
+    
+    assert len(df) == 20000
+    assert df['Position ID'].iloc[0] == 1
+
+
+def test_large_export_parses_timestamps_with_detected_format():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', UserWarning)
+        result = asyncio.run(make_plugin().parse(make_export(20000)))
+    
+    assert len(result['trades']) == 20000
+    assert result['trades'][0]['open_time'].startswith('2024-01-02T10:00:00')
@@ -0,0 +1,97 @@
+"""Risk assessment plugin tests for degenerate return series"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import warnings
+
+import numpy as np
+import pytest
+from scipy import stats
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGIN_DIR = os.path.join(ROOT, 'plugins', 'analysis-plugins', 'risk-assessment-plugin')
+sys.path.append(os.path.join(ROOT, 'backend', 'app'))
+
+spec = importlib.util.spec_from_file_location('risk_assessment_plugin', os.path.join(PLUGIN_DIR, 'plugin.py'))
+risk_plugin = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(risk_plugin)
+
+
+def make_plugin(config=None):
+    with open(os.path.join(PLUGIN_DIR, 'manifest.json')) as f:
+        plugin = risk_plugin.Plugin(risk_plugin.PluginManifest(**json.load(f)))
+    asyncio.run(plugin.initialize(config or {}))
+    return plugin
+
+
+def monte_carlo(trades, mode):
+    results = asyncio.run(make_plugin({'monte_carlo_mode': mode}).analyze({'trades': trades}))
+    return results['monte_carlo']
+
+
+PROFITS = np.random.default_rng(7).normal(1.5, 10.0, 500)
+TRADES = [{'profit': float(profit)} for profit in PROFITS]
+
+
+def test_constant_returns_have_zero_skew_and_kurtosis():
+    trades = [{'profit': 5.0, 'symbol': 'EURUSD'}] * 12
+    results = asyncio.run(make_plugin().analyze({'trades': trades}))
+    
+    assert results['basic_metrics']['skewness'] == 0.0
+    assert results['basic_metrics']['kurtosis'] == 0.0
+    assert results['var_analysis']['var_95_modified'] == 5.0
+    assert results['var_analysis']['var_99_modified'] == 5.0
+    # The response must stay encodable without NaN
+    json.dumps(results, allow_nan=False)
+
+
+def test_analytic_monte_carlo_matches_the_closed_form():
+    mean = PROFITS.mean()
+    std = PROFITS.std(ddof=1)
+    a = -mean / std
+    analytic = monte_carlo(TRADES, 'analytic')
+    
+    assert analytic['simulations'] == 0
+    assert analytic['percentiles']['p50'] == pytest.approx(mean)
+    assert analytic['probability_of_loss'] == pytest.approx(stats.norm.cdf(a))
+    assert analytic['probability_of_profit'] == pytest.approx(stats.norm.sf(a))
+    # Means of the fitted Normal truncated either side of break-even
+    assert analytic['expected_loss'] == pytest.approx(stats.truncnorm.mean(-np.inf, a, loc=mean, scale=std))
+    assert analytic['expected_profit'] == pytest.approx(stats.truncnorm.mean(a, np.inf, loc=mean, scale=std))
+
+
+def test_analytic_monte_carlo_agrees_with_sampling():
+    std = PROFITS.std(ddof=1)
+    analytic = monte_carlo(TRADES, 'analytic')
+    sampled = monte_carlo(TRADES, 'normal')
+    
+    # 10,000 draws put the sampled figures within a few standard errors of the exact ones
+    assert analytic['probability_of_loss'] == pytest.approx(sampled['probability_of_loss'], abs=0.02)
+    assert analytic['probability_of_profit'] == pytest.approx(sampled['probability_of_profit'], abs=0.02)
+    for key in ('expected_loss', 'expected_profit', 'worst_case_1pct', 'best_case_1pct'):
+        assert analytic[key] == pytest.approx(sampled[key], abs=0.05 * std)
+    for name, value in analytic['percentiles'].items():
+        assert value == pytest.approx(sampled['percentiles'][name], abs=0.05 * std)
+
+
+def test_analytic_monte_carlo_falls_back_to_sampling_without_volatility():
+    trades = [{'profit': 5.0}] * 12
+    analytic = monte_carlo(trades, 'analytic')
+    
+    assert analytic == monte_carlo(trades, 'normal')
+    assert analytic['simulations'] == 10000
+    assert analytic['percentiles']['p50'] == 5.0
+
+
+def test_single_trade_tail_has_nan_std_without_warning():
+    trades = [{'profit': float(profit)} for profit in range(-5, 15)]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        results = asyncio.run(make_plugin().analyze({'trades': trades}))
+    
+    # 20 trades leave one trade in the 5% tail
+    assert results['tail_risk']['extreme_loss_probability'] == 0.05
+    assert np.isnan(results['tail_risk']['tail_std'])
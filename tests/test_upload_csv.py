@@ -0,0 +1,61 @@
+"""Upload endpoint tests for CSV header detection"""
+
+import os
+import sys
+import warnings
+
+from fastapi.testclient import TestClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main
+
+client = TestClient(main.app)
+
+HEADER = "Ticket,Open Time,Type,Size,Symbol,Price,Profit\n"
+ROW = "{i},2024.01.02 10:00:00,buy,0.10,EURUSD,1.10000,{profit}\n"
+
+
+def make_report(rows: int) -> str:
+    """MT5-style CSV with a title line and a blank line before the header"""
+    body = "".join(ROW.format(i=i, profit=(i % 7) - 3) for i in range(rows))
+    return "Report line\n\n" + HEADER + body
+
+
+def upload(text: str) -> dict:
+    response = client.post("/api/v1/upload", files={"file": ("report.csv", text.encode(), "text/csv")})
+    assert response.status_code == 200
+    return response.json()["analysis"]
+
+
+def test_blank_line_preamble_small_file():
+    analysis = upload(make_report(100))
+    assert analysis["rows"] == 100
+    assert analysis["data_preview"][0]["Ticket"] == 0
+
+
+def test_blank_line_preamble_large_file_matches_c_engine():
+    analysis = upload(make_report(40000))
+    assert len(make_report(40000)) > main.PYARROW_CSV_THRESHOLD
+    assert analysis["rows"] == 40000
+    assert analysis["summary"]["total_records"] == 40000
+    assert analysis["data_preview"][0]["Ticket"] == 0
+    assert analysis["data_preview"][0]["Profit"] == -3
+
+
+def test_preview_reports_missing_value_strings_as_na():
+    text = HEADER + "1,2024.01.02 10:00:00,buy,0.10,inf,1.10000,5\n" + ROW.format(i=2, profit=-1)
+    analysis = upload(text)
+    assert analysis["data_preview"][0]["Symbol"] == "N/A"
+    assert analysis["data_preview"][1]["Symbol"] == "EURUSD"
+    assert analysis["summary"]["trading_stats"]["best_trade"]["symbol"] == "N/A"
+
+
+def test_infinite_profit_is_skipped_in_drawdown():
+    rows = "".join(f"{i},2024.01.02 10:00:00,buy,0.10,EURUSD,1.10000,{profit}\n"
+                   for i, profit in enumerate(("5", "inf", "-3", "2")))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        analysis = upload(HEADER + rows)
+    assert analysis["summary"]["trading_stats"]["max_drawdown"] == 0.0